@@ -2,10 +2,11 @@ from flask import Flask, jsonify, request
 from flask_cors import CORS
 from config import Config
 from chatbot.routes import chatbot_bp
+from recommender.model import build_model, set_current_model, get_current_model
+from recommender.scoring import top_similar, top_for_profile
+from http_cache import fingerprint, not_modified, cached_json, compress_response
+from profiling import init_profiling
 import pymysql
-import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import linear_kernel
 import traceback
 
 app = Flask(__name__)
@@ -14,11 +15,13 @@ CORS(app)
 # Register chatbot blueprint
 app.register_blueprint(chatbot_bp)
 
-# Global variables to store the model in memory
-tfidf_matrix = None
-cosine_sim = None
-indices = None
-tours_data = None
+# Gzip large JSON responses
+app.after_request(compress_response)
+
+# Opt-in request profiling (no-op unless PROFILING_ENABLED)
+init_profiling(app)
+
+# The trained model lives in recommender.model so the chatbot can share it
 
 def get_db_connection():
     return pymysql.connect(
@@ -31,15 +34,13 @@ def get_db_connection():
     )
 
 def train_model():
-    global tfidf_matrix, cosine_sim, indices, tours_data
-    
     print("Training Recommendation Model...")
     try:
         print("  -> Attempting to connect to DB...")
         conn = get_db_connection()
         print("  -> Connected! Executing query...")
         
-        # Use cursor manually with pymysql to avoid pandas warning and ensure correct data format
+        # Use cursor manually with pymysql to ensure correct data format
         with conn.cursor() as cursor:
             query = "SELECT tour_id, title, description, destination, category FROM tours WHERE is_active = 1"
             cursor.execute(query)
@@ -47,43 +48,50 @@ def train_model():
             
         conn.close()
         
-        # Convert list of dicts to DataFrame
-        tours_data = pd.DataFrame(result)
-        print(f"  -> Query executed. Found {len(tours_data)} rows.")
+        print(f"  -> Query executed. Found {len(result)} rows.")
         
-        if tours_data.empty:
+        if not result:
             print("No active tours found in database.")
             return
 
-        print("  -> Preprocessing data...")
-        tours_data['description'] = tours_data['description'].fillna('')
-        tours_data['title'] = tours_data['title'].fillna('')
-        tours_data['destination'] = tours_data['destination'].fillna('')
-        
-        tours_data['soup'] = tours_data['title'] + " " + tours_data['destination'] + " " + tours_data['description']
-        
-        print("  -> Vectorizing text (TF-IDF)...")
-        tfidf = TfidfVectorizer(stop_words='english')
-        tfidf_matrix = tfidf.fit_transform(tours_data['soup'])
-        print(f"  -> Vectorization complete. Matrix shape: {tfidf_matrix.shape}")
-        
-        print("  -> Calculating Cosine Similarity...")
-        cosine_sim = linear_kernel(tfidf_matrix, tfidf_matrix)
-        print("  -> Cosine Similarity complete.")
-        
-        indices = pd.Series(tours_data.index, index=tours_data['tour_id']).drop_duplicates()
-        print("  -> Index mapping complete.")
+        # build_model strips the descriptions from result before the similarity step
+        model = build_model(result)
+        del result
+        set_current_model(model)
         
         # DEBUG: Print all loaded IDs to help user debug
-        available_ids = tours_data['tour_id'].tolist()
-        print(f"DEBUG: Loaded {len(available_ids)} IDs. First 5: {available_ids[:5]}")
+        print(f"DEBUG: Loaded {len(model.tour_store)} IDs. First 5: {model.tour_store.ids[:5].tolist()}")
         
-        print(f"Model trained successfully with {len(tours_data)} tours.")
+        print(f"Model trained successfully with {len(model.tour_store)} tours (version {model.version}).")
         
     except Exception as e:
         print("CRITICAL ERROR in train_model:")
         traceback.print_exc()
 
+def parse_diversity():
+    """
+    MMR settings for ?diversify=true (optionally &lambda=0..1).
+    Returns (settings or None, error message or None).
+    """
+    if request.args.get('diversify', '').lower() not in ('1', 'true', 'yes'):
+        return None, None
+    
+    lambda_ = Config.RECOMMEND_MMR_LAMBDA
+    if request.args.get('lambda') is not None:
+        try:
+            lambda_ = float(request.args.get('lambda'))
+        except ValueError:
+            return None, "lambda must be a number"
+        if not 0 <= lambda_ <= 1:
+            return None, "lambda must be between 0 and 1"
+    
+    return {
+        "pool_size": Config.RECOMMEND_MMR_POOL,
+        "lambda_": lambda_,
+        "destination_penalty": Config.RECOMMEND_MMR_DESTINATION_PENALTY,
+        "category_penalty": Config.RECOMMEND_MMR_CATEGORY_PENALTY,
+    }, None
+
 # Train model on startup
 print("Starting application context...")
 with app.app_context():
@@ -92,7 +100,12 @@ print("Finished loading model. Starting Flask server...")
 
 @app.route('/health', methods=['GET'])
 def health():
-    return jsonify({"status": "ok", "tours_loaded": len(tours_data) if tours_data is not None else 0})
+    model = get_current_model()
+    return jsonify({
+        "status": "ok",
+        "tours_loaded": len(model.tour_store) if model is not None else 0,
+        "model_version": model.version if model is not None else None
+    })
 
 @app.route('/recommend', methods=['GET'])
 def recommend():
@@ -101,39 +114,36 @@ def recommend():
     if not tour_id:
         return jsonify({"error": "Missing tour_id parameter"}), 400
         
-    if indices is None:
+    diversity, error = parse_diversity()
+    if error:
+        return jsonify({"error": error}), 400
+        
+    model = get_current_model()
+    if model is None:
         return jsonify({"error": "Model not trained yet"}), 500
 
-    if tour_id not in indices:
+    # Get index of the tour
+    idx = model.tour_store.index_of(tour_id)
+    if idx is None:
         return jsonify({"error": "Tour ID not found in database"}), 404
 
-    try:
-        # Get index of the tour
-        idx = indices[tour_id]
-
-        # Handle case where multiple tours might have same ID (unlikely but possible if DB inconsistent)
-        if isinstance(idx, pd.Series):
-            idx = idx.iloc[0]
-
-        # Get pairwise similarity scores
-        sim_scores = list(enumerate(cosine_sim[idx]))
+    # Results only change when the model is retrained
+    etag = fingerprint(model.version, 'recommend', tour_id, diversity)
+    cached = not_modified(etag, Config.RECOMMEND_CACHE_MAX_AGE)
+    if cached is not None:
+        return cached
 
-        # Sort based on similarity scores
-        sim_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)
-
-        # Get the scores of the 5 most similar tours (ignoring the 0th which is itself)
-        sim_scores = sim_scores[1:6]
-
-        # Get the tour indices
-        tour_indices = [i[0] for i in sim_scores]
+    try:
+        # Indices of the 5 most similar tours (excluding itself), best first
+        tour_indices = top_similar(model, idx, k=5, diversity=diversity)
 
         # Return top similar tour IDs
-        result_ids = tours_data['tour_id'].iloc[tour_indices].tolist()
+        result_ids = model.tour_store.ids_at(tour_indices)
         
-        return jsonify({
+        return cached_json({
             "source_tour_id": tour_id,
             "recommendations": result_ids
-        })
+        }, etag, Config.RECOMMEND_CACHE_MAX_AGE)
     except Exception as e:
         print(f"Error during recommendation: {e}")
         return jsonify({"error": str(e)}), 500
@@ -145,7 +155,12 @@ def recommend_user():
     if not user_id:
         return jsonify({"error": "Missing user_id parameter"}), 400
         
-    if indices is None:
+    diversity, error = parse_diversity()
+    if error:
+        return jsonify({"error": error}), 400
+        
+    model = get_current_model()
+    if model is None:
         return jsonify({"error": "Model not trained yet"}), 500
 
     try:
@@ -171,7 +186,7 @@ def recommend_user():
         conn.close()
         
         # Unique liked tours
-        tours_liked = list(set(tours_liked))
+        tours_liked = sorted(set(tours_liked))
         
         if not tours_liked:
             return jsonify({
@@ -180,57 +195,32 @@ def recommend_user():
                 "recommendations": [] # In future, return Top Popular tours here
             })
 
+        # The profile can change between retrains, so it is part of the ETag
+        etag = fingerprint(model.version, 'recommend/user', user_id, diversity, *sorted(tours_liked))
+        cached = not_modified(etag, Config.RECOMMEND_USER_CACHE_MAX_AGE, private=True)
+        if cached is not None:
+            return cached
+
         # 2. Aggregate Similarity Scores
-        # Create a zero-vector for scores
-        total_scores = [0] * len(indices)
-        
-        valid_source_tours = 0
-        
-        for tour_id in tours_liked:
-            if tour_id in indices:
-                valid_source_tours += 1
-                idx = indices[tour_id]
-                if isinstance(idx, pd.Series): idx = idx.iloc[0]
-                
-                # Get similarity row for this tour
-                sim_scores = cosine_sim[idx]
-                
-                # Add to total
-                for i, score in enumerate(sim_scores):
-                    total_scores[i] += score
+        tour_store = model.tour_store
+        known_indices = [tour_store.index_of(tid) for tid in tours_liked if tid in tour_store]
                     
-        if valid_source_tours == 0:
+        if not known_indices:
              return jsonify({"user_id": user_id, "recommendations": []})
 
         # 3. Sort and Filter
-        # Pair indices with scores
-        sim_scores_enum = list(enumerate(total_scores))
-        
-        # Sort desc
-        sim_scores_enum = sorted(sim_scores_enum, key=lambda x: x[1], reverse=True)
-        
-        # Filter out tours user already knows (optional, but good for discovery)
-        # And get Top 5
-        final_recommendations = []
-        count = 0
-        
-        known_indices = [indices[tid] if not isinstance(indices[tid], pd.Series) else indices[tid].iloc[0] for tid in tours_liked if tid in indices]
-        
-        for i, score in sim_scores_enum:
-            if i not in known_indices:
-                final_recommendations.append(i)
-                count += 1
-                if count >= 5:
-                    break
+        # Sum the similarity rows of every known tour and take the Top 5,
+        # leaving out tours user already knows (good for discovery)
+        final_recommendations = top_for_profile(model, known_indices, k=5, diversity=diversity)
         
         # Convert indices back to Tour IDs
-        result_ids = tours_data['tour_id'].iloc[final_recommendations].tolist()
+        result_ids = tour_store.ids_at(final_recommendations)
 
-        return jsonify({
+        return cached_json({
             "user_id": user_id,
             "based_on_tours": tours_liked,
             "recommendations": result_ids
-        })
+        }, etag, Config.RECOMMEND_USER_CACHE_MAX_AGE, private=True)
         
     except Exception as e:
         print(f"Error in recommend_user: {e}")
@@ -0,0 +1 @@
+# Benchmarks for the AI service (not imported by the app)
@@ -0,0 +1,161 @@
+"""
+Catalog-scale benchmark for recommender training and scoring.
+
+For each catalog size N, generates synthetic Vietnamese tours and measures
+time and peak traced memory of every stage train_model() runs, plus the
+query paths behind /recommend and /recommend/user:
+
+    load        TourStore built from the fetched rows
+    vectorize   TF-IDF fit on the title/destination/description soup,
+                plus the model version fingerprint
+    similarity  dense cosine similarity matrix (linear_kernel)
+    single      top-5 similar tours for one tour
+    profile     top-5 tours for a 5-tour user profile
+    diverse     top-5 similar tours re-ranked by MMR over a 50-tour pool
+
+Each build stage calls the same function build_model() does.
+Timings come from a run without tracemalloc; peak memory from a second,
+traced run. Thresholds make the run exit with status 1 when exceeded.
+
+Usage (from ai-service/):
+    python -m benchmarks.bench_catalog --sizes 1000,5000,10000
+    python -m benchmarks.bench_catalog --sizes 5000 --max-build-s 30 --max-peak-mb 1024
+"""
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+
+from recommender.model import TrainedModel, compute_similarities, vectorize_tours
+from recommender.scoring import top_similar, top_for_profile
+from recommender.store import TourStore
+from benchmarks.synthetic import make_tours
+
+
+BUILD_STAGES = ('load', 'vectorize', 'similarity')
+QUERY_STAGES = ('single', 'profile', 'diverse')
+
+# Defaults from Config, kept here so the benchmark does not need a .env
+DIVERSITY = {"pool_size": 50, "lambda_": 0.7, "destination_penalty": 0.3, "category_penalty": 0.1}
+
+
+def run_stages(rows, queries, profiles):
+    """(stage, callable) pairs in train/serve order, sharing intermediate results."""
+    state = {}
+
+    def load():
+        state['store'] = TourStore(rows)
+
+    def vectorize():
+        state['vectorizer'], state['matrix'], state['version'] = vectorize_tours(rows, state['store'])
+
+    def similarity():
+        state['model'] = TrainedModel(
+            state['vectorizer'], state['matrix'],
+            compute_similarities(state['matrix']),
+            state['store'], state['version']
+        )
+
+    def single():
+        model = state['model']
+        for idx in queries:
+            top_similar(model, idx, k=5)
+
+    def profile():
+        model = state['model']
+        for known in profiles:
+            top_for_profile(model, known, k=5)
+
+    def diverse():
+        model = state['model']
+        for idx in queries:
+            top_similar(model, idx, k=5, diversity=DIVERSITY)
+
+    return [('load', load), ('vectorize', vectorize), ('similarity', similarity),
+            ('single', single), ('profile', profile), ('diverse', diverse)]
+
+
+def measure(n, query_count, traced):
+    rows = make_tours(n)
+    rng = random.Random(n)
+    queries = [rng.randrange(n) for _ in range(query_count)]
+    profiles = [rng.sample(range(n), min(5, n)) for _ in range(query_count)]
+
+    results = {}
+    if traced:
+        tracemalloc.start()
+    for stage, fn in run_stages(rows, queries, profiles):
+        if traced:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        if traced:
+            results[stage] = (tracemalloc.get_traced_memory()[1] - base) / 2 ** 20
+        else:
+            per_query = stage in QUERY_STAGES
+            results[stage] = elapsed / query_count * 1000 if per_query else elapsed
+    if traced:
+        tracemalloc.stop()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default="500,1000,2000,5000",
+                        help="comma-separated catalog sizes")
+    parser.add_argument('--queries', type=int, default=200,
+                        help="queries per size for the single/profile/diverse stages")
+    parser.add_argument('--no-memory', action='store_true',
+                        help="skip the traced run (faster, no peak memory column)")
+    parser.add_argument('--max-build-s', type=float,
+                        help="fail if load + vectorize + similarity exceeds this many seconds")
+    parser.add_argument('--max-peak-mb', type=float,
+                        help="fail if any stage's peak traced memory exceeds this many MiB")
+    parser.add_argument('--max-query-ms', type=float,
+                        help="fail if any query stage exceeds this many ms on average")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+
+    header = (f"{'N':>8} | {'load s':>8} {'vector s':>9} {'simil s':>9} {'build s':>9} | "
+              f"{'single ms':>9} {'profile ms':>10} {'diverse ms':>10}")
+    if not args.no_memory:
+        header += f" | {'peak MiB':>9} {'(stage)':<10}"
+    print(header)
+    print("-" * len(header))
+
+    failures = []
+    for n in sizes:
+        times = measure(n, args.queries, traced=False)
+        build = sum(times[stage] for stage in BUILD_STAGES)
+        line = (f"{n:>8} | {times['load']:>8.3f} {times['vectorize']:>9.3f} {times['similarity']:>9.3f} "
+                f"{build:>9.3f} | {times['single']:>9.3f} {times['profile']:>10.3f} {times['diverse']:>10.3f}")
+
+        if args.max_build_s is not None and build > args.max_build_s:
+            failures.append(f"N={n}: build {build:.2f}s > {args.max_build_s}s")
+        if args.max_query_ms is not None:
+            for stage in QUERY_STAGES:
+                if times[stage] > args.max_query_ms:
+                    failures.append(f"N={n}: {stage} query {times[stage]:.2f}ms > {args.max_query_ms}ms")
+
+        if not args.no_memory:
+            peaks = measure(n, args.queries, traced=True)
+            stage, peak = max(peaks.items(), key=lambda item: item[1])
+            line += f" | {peak:>9.1f} {stage:<10}"
+            if args.max_peak_mb is not None and peak > args.max_peak_mb:
+                failures.append(f"N={n}: {stage} peak {peak:.1f}MiB > {args.max_peak_mb}MiB")
+
+        print(line, flush=True)
+
+    if failures:
+        print("\nThresholds exceeded:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
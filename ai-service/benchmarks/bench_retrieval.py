@@ -0,0 +1,60 @@
+"""
+Benchmark: chatbot semantic retrieval latency per message.
+
+Fits the same TF-IDF vectorizer train_model() uses on a synthetic catalog
+and times retrieve_tours() (query embedding + sparse dot product + top-k).
+
+Usage (from ai-service/):
+    python -m benchmarks.bench_retrieval --tours 5000 --messages 1000
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from recommender.model import TrainedModel, build_soup, make_vectorizer
+from recommender.retrieval import retrieve_tours
+from recommender.store import TourStore
+from benchmarks.synthetic import make_tours, DESTINATIONS
+
+
+MESSAGES = [
+    "Tôi muốn đi {dest} cùng gia đình",
+    "Gợi ý tour {dest} dịp cuối tuần",
+    "Có tour nào ở {dest} không?",
+    "Du lịch {dest} nên đi đâu",
+    "xin chào",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tours', type=int, default=5000)
+    parser.add_argument('--messages', type=int, default=1000)
+    parser.add_argument('--k', type=int, default=5)
+    args = parser.parse_args()
+
+    tours = make_tours(args.tours)
+    store = TourStore(tours)
+    vectorizer = make_vectorizer()
+    matrix = vectorizer.fit_transform(build_soup(tours, store))
+    model = TrainedModel(vectorizer, matrix, None, store, "bench")
+
+    rng = random.Random(0)
+    messages = [rng.choice(MESSAGES).format(dest=rng.choice(list(DESTINATIONS))) for _ in range(args.messages)]
+
+    timings = []
+    for message in messages:
+        start = time.perf_counter()
+        retrieve_tours(model, message, k=args.k, min_score=0.05)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings = np.array(timings)
+    print(f"{args.tours} tours, vocabulary {len(vectorizer.vocabulary_)}, {args.messages} messages, k={args.k}")
+    print(f"retrieval ms: mean {timings.mean():.3f} | p50 {np.percentile(timings, 50):.3f} "
+          f"| p95 {np.percentile(timings, 95):.3f} | p99 {np.percentile(timings, 99):.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Benchmark: pandas DataFrame/Series lookups vs TourStore in the recommend path.
+
+Measures the memory held by the per-tour structures and the latency of the
+/recommend and /recommend/user scoring logic with both representations.
+pandas is only needed to run the "before" side of this benchmark.
+
+Usage (from ai-service/):
+    python -m benchmarks.bench_tour_store --tours 2000 --requests 500
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+import numpy as np
+
+from recommender.model import TrainedModel
+from recommender.scoring import top_similar, top_for_profile
+from recommender.store import TourStore
+from benchmarks.synthetic import make_tours
+
+
+def build_pandas(tours):
+    import pandas as pd
+    tours_data = pd.DataFrame(tours)
+    tours_data['soup'] = tours_data['title'] + " " + tours_data['destination'] + " " + tours_data['description']
+    indices = pd.Series(tours_data.index, index=tours_data['tour_id']).drop_duplicates()
+    return tours_data, indices
+
+
+def recommend_pandas(tours_data, indices, cosine_sim, tour_id):
+    import pandas as pd
+    idx = indices[tour_id]
+    if isinstance(idx, pd.Series):
+        idx = idx.iloc[0]
+    sim_scores = sorted(enumerate(cosine_sim[idx]), key=lambda x: x[1], reverse=True)[1:6]
+    return tours_data['tour_id'].iloc[[i[0] for i in sim_scores]].tolist()
+
+
+def recommend_user_pandas(tours_data, indices, cosine_sim, liked):
+    import pandas as pd
+    total_scores = [0] * len(indices)
+    for tour_id in liked:
+        idx = indices[tour_id]
+        if isinstance(idx, pd.Series):
+            idx = idx.iloc[0]
+        for i, score in enumerate(cosine_sim[idx]):
+            total_scores[i] += score
+    known = [indices[tid] for tid in liked]
+    ranked = sorted(enumerate(total_scores), key=lambda x: x[1], reverse=True)
+    picks = [i for i, _ in ranked if i not in known][:5]
+    return tours_data['tour_id'].iloc[picks].tolist()
+
+
+def recommend_store(model, tour_id):
+    idx = model.tour_store.index_of(tour_id)
+    return model.tour_store.ids_at(top_similar(model, idx, k=5))
+
+
+def recommend_user_store(model, liked):
+    known = [model.tour_store.index_of(tid) for tid in liked]
+    return model.tour_store.ids_at(top_for_profile(model, known, k=5))
+
+
+def measure_memory(build, tours):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = build(tours)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    return result, size
+
+
+def time_per_call(fn, args_list):
+    start = time.perf_counter()
+    for args in args_list:
+        fn(*args)
+    return (time.perf_counter() - start) / len(args_list) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tours', type=int, default=2000)
+    parser.add_argument('--requests', type=int, default=500)
+    args = parser.parse_args()
+
+    tours = make_tours(args.tours)
+    rng = np.random.default_rng(0)
+    cosine_sim = rng.random((args.tours, args.tours))
+    ids = [t['tour_id'] for t in tours]
+    single = [random.Random(i).choice(ids) for i in range(args.requests)]
+    profiles = [random.Random(i).sample(ids, 5) for i in range(args.requests)]
+
+    store, store_bytes = measure_memory(TourStore, tours)
+    model = TrainedModel(None, None, cosine_sim, store, "bench")
+    store_single = time_per_call(lambda t: recommend_store(model, t), [(t,) for t in single])
+    store_user = time_per_call(lambda p: recommend_user_store(model, p), [(p,) for p in profiles])
+
+    print(f"{args.tours} tours, {args.requests} requests per endpoint")
+    print(f"{'':<12}{'memory (KiB)':>14}{'/recommend (ms)':>18}{'/recommend/user (ms)':>22}")
+
+    try:
+        import pandas  # noqa: F401  (imported up front so it is not counted as data)
+    except ImportError:
+        print(f"{'TourStore':<12}{store_bytes / 1024:>14.1f}{store_single:>18.3f}{store_user:>22.3f}")
+        print("pandas is not installed; skipping the baseline.")
+        return
+
+    (tours_data, indices), pandas_bytes = measure_memory(build_pandas, tours)
+
+    pandas_single = time_per_call(lambda t: recommend_pandas(tours_data, indices, cosine_sim, t), [(t,) for t in single])
+    pandas_user = time_per_call(lambda p: recommend_user_pandas(tours_data, indices, cosine_sim, p), [(p,) for p in profiles])
+
+    print(f"{'pandas':<12}{pandas_bytes / 1024:>14.1f}{pandas_single:>18.3f}{pandas_user:>22.3f}")
+    print(f"{'TourStore':<12}{store_bytes / 1024:>14.1f}{store_single:>18.3f}{store_user:>22.3f}")
+    print(f"{'speedup':<12}{pandas_bytes / max(store_bytes, 1):>13.1f}x"
+          f"{pandas_single / store_single:>17.1f}x{pandas_user / store_user:>21.1f}x")
+
+
+if __name__ == '__main__':
+    main()
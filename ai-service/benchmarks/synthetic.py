@@ -0,0 +1,75 @@
+"""
+Synthetic tour catalog shaped like the rows train_model() reads from `tours`.
+"""
+import random
+
+
+DESTINATIONS = {
+    'Hà Nội': ('NORTH', ['Hồ Gươm', 'phố cổ', 'Văn Miếu', 'lăng Bác', 'Hồ Tây']),
+    'Hạ Long': ('NORTH', ['vịnh Hạ Long', 'hang Sửng Sốt', 'đảo Titop', 'làng chài Cửa Vạn']),
+    'Sa Pa': ('NORTH', ['Fansipan', 'bản Cát Cát', 'ruộng bậc thang', 'thung lũng Mường Hoa']),
+    'Ninh Bình': ('NORTH', ['Tràng An', 'Tam Cốc', 'chùa Bái Đính', 'hang Múa']),
+    'Huế': ('CENTRAL', ['Đại Nội', 'chùa Thiên Mụ', 'lăng Khải Định', 'sông Hương']),
+    'Đà Nẵng': ('CENTRAL', ['Bà Nà Hills', 'Cầu Vàng', 'biển Mỹ Khê', 'Ngũ Hành Sơn', 'bán đảo Sơn Trà']),
+    'Hội An': ('CENTRAL', ['phố cổ Hội An', 'chùa Cầu', 'làng gốm Thanh Hà', 'Cù Lao Chàm']),
+    'Quy Nhơn': ('CENTRAL', ['Eo Gió', 'Kỳ Co', 'tháp Đôi', 'Ghềnh Ráng']),
+    'Nha Trang': ('CENTRAL', ['Vinpearl', 'tháp Bà Ponagar', 'đảo Hòn Mun', 'tắm bùn khoáng']),
+    'Đà Lạt': ('CENTRAL', ['hồ Xuân Hương', 'đồi chè Cầu Đất', 'thác Datanla', 'Langbiang']),
+    'Hồ Chí Minh': ('SOUTH', ['chợ Bến Thành', 'địa đạo Củ Chi', 'Nhà thờ Đức Bà', 'phố đi bộ Nguyễn Huệ']),
+    'Cần Thơ': ('SOUTH', ['chợ nổi Cái Răng', 'vườn trái cây', 'nhà cổ Bình Thủy', 'bến Ninh Kiều']),
+    'Phú Quốc': ('SOUTH', ['Bãi Sao', 'Hòn Thơm', 'Grand World', 'làng chài Hàm Ninh', 'nhà thùng nước mắm']),
+    'Côn Đảo': ('SOUTH', ['nhà tù Côn Đảo', 'bãi Đầm Trầu', 'nghĩa trang Hàng Dương', 'lặn ngắm san hô']),
+}
+
+CATEGORIES = {
+    'BEACH': ['tắm biển', 'lặn ngắm san hô', 'chèo kayak', 'ngắm hoàng hôn trên biển'],
+    'CULTURAL': ['tham quan di tích lịch sử', 'tìm hiểu văn hóa địa phương', 'xem biểu diễn nghệ thuật truyền thống'],
+    'ADVENTURE': ['trekking xuyên rừng', 'leo núi', 'cắm trại qua đêm', 'đi mô tô khám phá'],
+    'MOUNTAIN': ['săn mây', 'chinh phục đỉnh núi', 'ngắm ruộng bậc thang', 'thăm bản làng dân tộc'],
+    'FOOD': ['thưởng thức đặc sản', 'tham gia lớp nấu ăn', 'khám phá chợ đêm', 'ăn hải sản tươi sống'],
+    'CITY': ['dạo phố', 'mua sắm', 'tham quan bảo tàng', 'ngắm thành phố về đêm'],
+    'ECOTOURISM': ['đi thuyền trên sông', 'tham quan vườn quốc gia', 'trải nghiệm homestay', 'ngắm chim'],
+    'FAMILY': ['vui chơi công viên giải trí', 'hoạt động cho trẻ em', 'nghỉ dưỡng resort', 'tham quan thủy cung'],
+}
+
+SENTENCES = [
+    "Hành trình đưa quý khách khám phá {place} và {place2}.",
+    "Ngày {day}: {activity} tại {place}, buổi tối {activity2}.",
+    "Quý khách sẽ được {activity} cùng hướng dẫn viên nhiệt tình, giàu kinh nghiệm.",
+    "Tour bao gồm xe đưa đón, khách sạn {stars} sao, vé tham quan và bữa ăn theo chương trình.",
+    "Điểm nhấn của chuyến đi là {place} với cảnh quan tuyệt đẹp.",
+    "Thời điểm lý tưởng để {activity} là sáng sớm hoặc chiều muộn.",
+    "Phù hợp cho gia đình, nhóm bạn và khách đi lần đầu đến {destination}.",
+]
+
+
+def make_tours(n, seed=42, sentences=8):
+    """n tour rows with Vietnamese titles and itinerary-style descriptions."""
+    rng = random.Random(seed)
+    destinations = list(DESTINATIONS)
+    categories = list(CATEGORIES)
+    tours = []
+    for i in range(n):
+        destination = rng.choice(destinations)
+        region, places = DESTINATIONS[destination]
+        category = rng.choice(categories)
+        activities = CATEGORIES[category]
+        days = rng.randint(2, 6)
+
+        description = " ".join(
+            rng.choice(SENTENCES).format(
+                place=rng.choice(places), place2=rng.choice(places),
+                activity=rng.choice(activities), activity2=rng.choice(activities),
+                day=rng.randint(1, days), stars=rng.randint(3, 5), destination=destination,
+            )
+            for _ in range(sentences)
+        )
+        tours.append({
+            'tour_id': f"tour-{i:07d}",
+            'title': f"Tour {destination} {days}N{days - 1}Đ: {rng.choice(places)} - {rng.choice(activities)}",
+            'description': description,
+            'destination': destination,
+            'region': region,
+            'category': category,
+        })
+    return tours
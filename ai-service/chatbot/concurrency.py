@@ -0,0 +1,161 @@
+"""
+Concurrency helpers for Gemini calls.
+
+- SingleFlight: concurrent identical requests share one upstream call.
+- AdmissionController: bounded concurrency with a queue-time budget.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+
+class ChatOverloadedError(Exception):
+    """Raised when a request cannot be admitted to the Gemini call queue."""
+
+    def __init__(self, message, status_code=503, retry_after=1):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into a single execution."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        """Run fn() once per key; followers wait and share the leader's result."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.leaders += 1
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    def stats(self):
+        with self._lock:
+            in_flight = len(self._calls)
+        return {
+            "in_flight_keys": in_flight,
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+        }
+
+
+class AdmissionController:
+    """
+    Bounded concurrency with a waiting queue.
+
+    Requests beyond max_concurrency wait up to queue_timeout seconds for a slot.
+    When max_queue requests are already waiting, new ones are rejected with 429;
+    requests that exhaust their queue-time budget are rejected with 503.
+    """
+
+    def __init__(self, max_concurrency, max_queue, queue_timeout):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._active = 0
+        self._waiting = 0
+        self._admitted = 0
+        self._rejected_full = 0
+        self._rejected_timeout = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._wait_last = 0.0
+
+    @contextmanager
+    def slot(self, timeout=None):
+        """Hold a concurrency slot, waiting at most min(queue_timeout, timeout)."""
+        queue_timeout = self.queue_timeout if timeout is None else min(self.queue_timeout, timeout)
+        start = time.monotonic()
+        acquired = self._slots.acquire(blocking=False)
+
+        if not acquired:
+            with self._lock:
+                if self._waiting >= self.max_queue:
+                    self._rejected_full += 1
+                    raise ChatOverloadedError(
+                        "Chat service is busy, please retry shortly",
+                        status_code=429,
+                        retry_after=max(1, round(self.queue_timeout)),
+                    )
+                self._waiting += 1
+            try:
+                acquired = self._slots.acquire(timeout=queue_timeout)
+            finally:
+                with self._lock:
+                    self._waiting -= 1
+            if not acquired:
+                with self._lock:
+                    self._rejected_timeout += 1
+                raise ChatOverloadedError(
+                    "Chat service is overloaded, please retry shortly",
+                    status_code=503,
+                    retry_after=max(1, round(self.queue_timeout)),
+                )
+
+        waited = time.monotonic() - start
+        with self._lock:
+            self._active += 1
+            self._admitted += 1
+            self._wait_total += waited
+            self._wait_last = waited
+            self._wait_max = max(self._wait_max, waited)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._active -= 1
+            self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            avg_wait = self._wait_total / self._admitted if self._admitted else 0.0
+            return {
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+                "queue_timeout_s": self.queue_timeout,
+                "active": self._active,
+                "queue_depth": self._waiting,
+                "admitted": self._admitted,
+                "rejected_queue_full": self._rejected_full,
+                "rejected_queue_timeout": self._rejected_timeout,
+                "wait_avg_ms": round(avg_wait * 1000, 2),
+                "wait_max_ms": round(self._wait_max * 1000, 2),
+                "wait_last_ms": round(self._wait_last * 1000, 2),
+            }
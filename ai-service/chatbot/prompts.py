@@ -35,3 +35,16 @@ def build_context_prompt(tours_data=None):
     if tours_data:
         return f"[DỮ LIỆU TOUR TỪ HỆ THỐNG]\n{tours_data}"
     return None
+
+
+def build_fallback_response(tours_data=None):
+    """Templated answer used when Gemini is unavailable."""
+    if not tours_data:
+        return ("Xin lỗi, trợ lý AI đang tạm thời quá tải. "
+                "Vui lòng thử lại sau ít phút hoặc xem danh sách tour trên trang chủ.")
+    return (
+        "Xin lỗi, trợ lý AI đang tạm thời quá tải. "
+        "Dưới đây là các tour phù hợp với yêu cầu của bạn:\n\n"
+        f"{tours_data}\n\n"
+        "Vui lòng xem chi tiết trên trang tour hoặc thử lại sau ít phút để được tư vấn thêm."
+    )
@@ -0,0 +1,164 @@
+"""
+Deadlines, retries and circuit breaking for Gemini calls.
+"""
+import random
+import threading
+import time
+
+
+class GeminiUnavailableError(Exception):
+    """Base class for Gemini calls that did not produce a response."""
+    status_code = 503
+
+    def __init__(self, message, retry_after=1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(GeminiUnavailableError):
+    """Raised without calling Gemini while the circuit breaker is open."""
+    status_code = 503
+
+
+class DeadlineExceededError(GeminiUnavailableError):
+    """Raised when the total time budget for a Gemini call runs out."""
+    status_code = 504
+
+
+class Deadline:
+    """Absolute deadline measured on the monotonic clock."""
+
+    def __init__(self, budget):
+        self.expires_at = time.monotonic() + budget
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    CLOSED: calls pass; failure_threshold consecutive failures open the circuit.
+    OPEN: calls are rejected until reset_timeout seconds have passed.
+    HALF_OPEN: a single probe call is let through; success closes the circuit,
+    failure opens it again.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._opens = 0
+        self._short_circuited = 0
+
+    def _retry_after(self):
+        return max(1, round(self._opened_at + self.reset_timeout - time.monotonic()))
+
+    def before_call(self):
+        """Raise CircuitOpenError if the call must not go upstream."""
+        with self._lock:
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    self._short_circuited += 1
+                    raise CircuitOpenError("Gemini circuit is open", retry_after=self._retry_after())
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+
+            if self._state == self.HALF_OPEN:
+                if self._probe_in_flight:
+                    self._short_circuited += 1
+                    raise CircuitOpenError("Gemini circuit is half-open, probe in flight")
+                self._probe_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self._opens += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+    def release(self):
+        """Give back a half-open probe slot without judging the upstream."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def stats(self):
+        state = self.state
+        with self._lock:
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "failure_threshold": self.failure_threshold,
+                "reset_timeout_s": self.reset_timeout,
+                "opens": self._opens,
+                "short_circuited": self._short_circuited,
+            }
+
+
+def call_with_retries(fn, deadline, breaker, per_call_timeout, max_retries,
+                      backoff_base, backoff_cap=2.0, is_retryable=None,
+                      min_attempt_time=0.5):
+    """
+    Call fn(timeout) with retries and full-jitter backoff inside a total budget.
+
+    Every attempt passes through the circuit breaker and gets at most
+    per_call_timeout seconds, clipped to what is left of the deadline.
+    Exceptions for which is_retryable returns False are raised immediately
+    and do not count as upstream failures. Once retries are exhausted the last
+    upstream error is raised as GeminiUnavailableError.
+    """
+    attempt = 0
+    while True:
+        remaining = deadline.remaining()
+        if remaining < min_attempt_time:
+            raise DeadlineExceededError("Gemini call deadline exceeded")
+
+        breaker.before_call()
+        try:
+            result = fn(min(per_call_timeout, remaining))
+        except Exception as e:
+            if is_retryable is not None and not is_retryable(e):
+                breaker.release()
+                raise
+            breaker.record_failure()
+            print(f"Gemini attempt {attempt + 1} failed: {e}")
+            attempt += 1
+            if attempt > max_retries:
+                if deadline.expired():
+                    raise DeadlineExceededError("Gemini call deadline exceeded") from e
+                raise GeminiUnavailableError(f"Gemini unavailable after {attempt} attempts") from e
+            sleep_for = random.uniform(0, min(backoff_cap, backoff_base * (2 ** attempt)))
+            if sleep_for >= deadline.remaining() - min_attempt_time:
+                raise DeadlineExceededError("Gemini call deadline exceeded") from e
+            time.sleep(sleep_for)
+            continue
+
+        breaker.record_success()
+        return result
@@ -2,7 +2,10 @@
 Flask routes for chatbot API.
 """
 from flask import Blueprint, request, jsonify
-from chatbot.service import chat
+from chatbot.service import chat, get_metrics, session_store
+from chatbot.concurrency import ChatOverloadedError
+from chatbot.resilience import GeminiUnavailableError
+from chatbot.sessions import SessionNotFoundError, SessionStoreUnavailableError
 
 
 chatbot_bp = Blueprint('chatbot', __name__, url_prefix='/api/chatbot')
@@ -22,9 +25,18 @@ def chat_endpoint():
             ]
         }
     
+    Session mode: send "session_id" instead of "history" and the server keeps
+    the conversation. Use "session_id": null to start a new session.
+    
+        {
+            "message": "User's message",
+            "session_id": "id returned by a previous response" | null
+        }
+    
     Response:
         {
-            "response": "AI response text"
+            "response": "AI response text",
+            "session_id": "..."  (session mode only)
         }
     """
     try:
@@ -37,6 +49,22 @@ def chat_endpoint():
         if not message or not message.strip():
             return jsonify({"error": "Message is required"}), 400
         
+        message = message.strip()
+        
+        # Session mode: history lives on the server
+        if 'session_id' in data:
+            session_id = data.get('session_id')
+            if session_id is None:
+                session_id = session_store.create()
+            elif not isinstance(session_id, str):
+                return jsonify({"error": "session_id must be a string"}), 400
+            
+            history = session_store.get_history(session_id)
+            response_text = chat(message, history)
+            session_store.append_turn(session_id, message, response_text)
+            
+            return jsonify({"response": response_text, "session_id": session_id})
+        
         history = data.get('history', [])
         
         # Validate history format
@@ -44,10 +72,20 @@ def chat_endpoint():
             return jsonify({"error": "History must be an array"}), 400
         
         # Call chat service
-        response_text = chat(message.strip(), history)
+        response_text = chat(message, history)
         
         return jsonify({"response": response_text})
         
+    except SessionNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    except (ChatOverloadedError, GeminiUnavailableError, SessionStoreUnavailableError) as e:
+        return jsonify({"error": str(e)}), e.status_code, {"Retry-After": str(e.retry_after)}
     except Exception as e:
         print(f"Error in chat endpoint: {e}")
         return jsonify({"error": "Internal server error", "details": str(e)}), 500
+
+
+@chatbot_bp.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Expose Gemini call, fallback and session store metrics."""
+    return jsonify(get_metrics())
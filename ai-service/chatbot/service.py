@@ -3,15 +3,55 @@ Chatbot service with Gemini AI integration.
 Fully aligned with Java backend capabilities.
 """
 import re
+import hashlib
+import threading
 from google import genai
+from google.genai import errors as genai_errors
 from config import Config
-from chatbot.prompts import SYSTEM_PROMPT, build_context_prompt
-from database.queries import get_tours_summary, search_tours, get_tour_details
+from chatbot.prompts import SYSTEM_PROMPT, build_context_prompt, build_fallback_response
+from chatbot.concurrency import SingleFlight, AdmissionController, ChatOverloadedError
+from chatbot.sessions import SessionStore, WriteBehindWriter
+from chatbot.resilience import (
+    CircuitBreaker, Deadline, DeadlineExceededError, GeminiUnavailableError, call_with_retries
+)
+from database.queries import get_tours_summary, search_tours, get_tour_details, get_tours_by_ids
+from recommender.model import get_current_model
+from recommender.retrieval import retrieve_tours
 
 
 # Initialize Gemini client
 client = genai.Client(api_key=Config.GEMINI_API_KEY)
 MODEL = "gemini-2.5-flash"
+# Shortest time worth spending on one Gemini attempt
+MIN_ATTEMPT_TIME = 0.5
+
+# Shared across request threads of this worker
+single_flight = SingleFlight()
+admission = AdmissionController(
+    max_concurrency=Config.GEMINI_MAX_CONCURRENCY,
+    max_queue=Config.GEMINI_MAX_QUEUE,
+    queue_timeout=Config.GEMINI_QUEUE_TIMEOUT,
+)
+breaker = CircuitBreaker(
+    failure_threshold=Config.GEMINI_BREAKER_THRESHOLD,
+    reset_timeout=Config.GEMINI_BREAKER_RESET,
+)
+session_store = SessionStore(
+    WriteBehindWriter(
+        flush_interval=Config.CHAT_SESSION_FLUSH_INTERVAL,
+        batch_size=Config.CHAT_SESSION_FLUSH_BATCH,
+        max_pending=Config.CHAT_SESSION_MAX_PENDING,
+    ),
+    max_sessions=Config.CHAT_SESSION_MAX,
+    max_messages=Config.CHAT_SESSION_MAX_MESSAGES,
+)
+
+# Intents whose templated answer is still worth serving when the deadline ran out;
+# with the breaker open or retries exhausted any intent with tour context falls back
+FALLBACK_INTENTS = ('tour_list', 'tour_search')
+
+_stats_lock = threading.Lock()
+_chat_stats = {"requests": 0, "fallbacks": 0}
 
 
 def extract_price_from_message(message):
@@ -157,10 +197,26 @@ def detect_intent(message):
     return ('general', {})
 
 
-def get_context_data(intent, params):
+def retrieve_relevant_tours(message, limit):
+    """
+    Tours most similar to the message under the recommender's TF-IDF model,
+    formatted for context. None if retrieval is off or nothing matches.
+    """
+    model = get_current_model()
+    if not Config.CHATBOT_SEMANTIC_RETRIEVAL or model is None:
+        return None
+    
+    matches = retrieve_tours(model, message, k=limit, min_score=Config.CHATBOT_RETRIEVAL_MIN_SCORE)
+    if not matches:
+        return None
+    return get_tours_by_ids([tour_id for tour_id, _ in matches])
+
+
+def get_context_data(intent, params, message=""):
     """Fetch relevant data from database based on intent."""
     if intent == 'tour_list':
-        return {'tours_data': get_tours_summary(limit=5)}
+        tours_data = retrieve_relevant_tours(message, limit=Config.CHATBOT_RETRIEVAL_K)
+        return {'tours_data': tours_data or get_tours_summary(limit=5)}
     
     elif intent == 'tour_search':
         return {'tours_data': search_tours(
@@ -179,11 +235,85 @@ def get_context_data(intent, params):
         tour_id = params.get('tour_id')
         if tour_id:
             return {'tours_data': get_tour_details(tour_id)}
-        return {'tours_data': get_tours_summary(limit=3)}
+        tours_data = retrieve_relevant_tours(message, limit=3)
+        return {'tours_data': tours_data or get_tours_summary(limit=3)}
     
+    # General chat: only add context when the message matches some tours
+    tours_data = retrieve_relevant_tours(message, limit=Config.CHATBOT_RETRIEVAL_K)
+    if tours_data:
+        return {'tours_data': tours_data}
     return None
 
 
+def is_retryable(error):
+    """Local rejections and client errors (other than timeouts/rate limits) are final."""
+    if isinstance(error, (ChatOverloadedError, DeadlineExceededError)):
+        return False
+    if isinstance(error, genai_errors.ClientError):
+        return error.code in (408, 429)
+    return True
+
+
+def generate_reply(contents):
+    """Call Gemini with a per-call deadline, retries and circuit breaking."""
+    deadline = Deadline(Config.GEMINI_TOTAL_BUDGET)
+
+    def attempt(timeout):
+        with admission.slot(timeout=timeout):
+            # Time spent queueing for the slot counts against the attempt.
+            # google-genai treats a zero timeout as none at all, so never send one
+            timeout = min(timeout, deadline.remaining())
+            if timeout < MIN_ATTEMPT_TIME:
+                raise DeadlineExceededError("Gemini call deadline exceeded while queued")
+            response = client.models.generate_content(
+                model=MODEL,
+                contents=contents,
+                config={
+                    "system_instruction": SYSTEM_PROMPT,
+                    "temperature": 0.7,
+                    "max_output_tokens": 1024,
+                    "http_options": {"timeout": max(1, int(timeout * 1000))},
+                }
+            )
+        return response.text
+
+    return call_with_retries(
+        attempt,
+        deadline=deadline,
+        breaker=breaker,
+        per_call_timeout=Config.GEMINI_CALL_TIMEOUT,
+        max_retries=Config.GEMINI_MAX_RETRIES,
+        backoff_base=Config.GEMINI_BACKOFF_BASE,
+        is_retryable=is_retryable,
+        min_attempt_time=MIN_ATTEMPT_TIME,
+    )
+
+
+def _record_request(fallback):
+    with _stats_lock:
+        _chat_stats["requests"] += 1
+        if fallback:
+            _chat_stats["fallbacks"] += 1
+
+
+def get_metrics():
+    """Snapshot of Gemini call, fallback and session store counters."""
+    with _stats_lock:
+        requests = _chat_stats["requests"]
+        fallbacks = _chat_stats["fallbacks"]
+    return {
+        "admission": admission.stats(),
+        "single_flight": single_flight.stats(),
+        "circuit_breaker": breaker.stats(),
+        "fallback": {
+            "requests": requests,
+            "fallbacks": fallbacks,
+            "rate": round(fallbacks / requests, 4) if requests else 0.0,
+        },
+        "sessions": session_store.stats(),
+    }
+
+
 def chat(message, history=None):
     """
     Process a chat message and return AI response.
@@ -201,7 +331,7 @@ def chat(message, history=None):
     try:
         # Detect user intent and get relevant data
         intent, params = detect_intent(message)
-        context_data = get_context_data(intent, params)
+        context_data = get_context_data(intent, params, message)
         
         # Build conversation contents for Gemini
         contents = []
@@ -226,18 +356,29 @@ def chat(message, history=None):
             "parts": [{"text": user_message}]
         })
         
-        # Call Gemini API
-        response = client.models.generate_content(
-            model=MODEL,
-            contents=contents,
-            config={
-                "system_instruction": SYSTEM_PROMPT,
-                "temperature": 0.7,
-                "max_output_tokens": 1024,
-            }
-        )
+        try:
+            # History-free requests with the same prompt share one upstream call
+            if not history:
+                key = hashlib.sha256(user_message.encode("utf-8")).hexdigest()
+                reply = single_flight.do(key, lambda: generate_reply(contents))
+            else:
+                reply = generate_reply(contents)
+        except GeminiUnavailableError as e:
+            # Open breaker, expired deadline or exhausted retries:
+            # serve the tours we already fetched instead of failing the request
+            deadline_only = isinstance(e, DeadlineExceededError) and intent not in FALLBACK_INTENTS
+            if context_data and not deadline_only:
+                print(f"Gemini unavailable ({e}), serving templated answer")
+                _record_request(fallback=True)
+                return build_fallback_response(**context_data)
+            _record_request(fallback=False)
+            raise
+        except Exception:
+            _record_request(fallback=False)
+            raise
         
-        return response.text
+        _record_request(fallback=False)
+        return reply
         
     except Exception as e:
         print(f"Error in chat service: {e}")
@@ -0,0 +1,286 @@
+"""
+Server-side chat sessions.
+
+- SessionStore: bounded in-memory LRU of recent conversation history.
+- WriteBehindWriter: persists turns to chat_sessions/chat_messages in batches
+  from a background thread so chat turns never wait on the database.
+
+The cache and the write-behind queue are per process, so sessions assume a
+single worker (the Procfile's default gunicorn setup) or sticky routing by
+session_id. Another worker can resolve a session, since its row is inserted
+on create, but it only sees turns once they are flushed, and its cached copy
+is not refreshed when other workers append to the session.
+"""
+import atexit
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict, deque
+from datetime import datetime
+
+from database.queries import create_chat_session, get_chat_session_messages, save_chat_batch
+
+
+class SessionNotFoundError(Exception):
+    """Raised when a session_id is neither cached nor stored in the database."""
+
+
+class SessionStoreUnavailableError(Exception):
+    """Raised when the chat tables cannot be read or written."""
+    status_code = 503
+
+    def __init__(self, message, retry_after=1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class WriteBehindWriter:
+    """Queue chat rows in memory and flush them to MySQL in batches."""
+    MAX_FLUSH_ATTEMPTS = 3
+
+    def __init__(self, flush_interval, batch_size, max_pending):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self._pending = deque()
+        self._pending_by_session = Counter()
+        self._in_flight = []
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._flushed = 0
+        self._batches = 0
+        self._failures = 0
+        self._dropped = 0
+        self._last_flush_ms = 0.0
+        self._last_lag_ms = 0.0
+
+    def _ensure_started(self):
+        # Started lazily so forked workers each get their own flusher thread
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="chat-write-behind", daemon=True)
+            self._thread.start()
+            atexit.register(self.flush)
+
+    def enqueue(self, session_id, content, is_staff):
+        now = datetime.now()
+        row = {
+            "queued_at": time.monotonic(),
+            "attempts": 0,
+            "session": (session_id, now, now),
+            "message": (str(uuid.uuid4()), session_id, content, is_staff, now),
+        }
+        with self._cond:
+            self._ensure_started()
+            if len(self._pending) >= self.max_pending:
+                self._forget([self._pending.popleft()])
+                self._dropped += 1
+            self._pending.append(row)
+            self._pending_by_session[session_id] += 1
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify()
+
+    def _forget(self, rows):
+        # Caller holds self._cond
+        for row in rows:
+            session_id = row["session"][0]
+            self._pending_by_session[session_id] -= 1
+            if self._pending_by_session[session_id] <= 0:
+                del self._pending_by_session[session_id]
+
+    def has_pending(self, session_id):
+        """True while the session has rows that are not in the database yet."""
+        with self._cond:
+            return session_id in self._pending_by_session
+
+    def pending_messages(self, session_id):
+        """Unflushed messages of a session, oldest first, including the batch being written."""
+        with self._cond:
+            if session_id not in self._pending_by_session:
+                return []
+            return [
+                {
+                    "message_id": row["message"][0],
+                    "role": "assistant" if row["message"][3] else "user",
+                    "content": row["message"][2],
+                }
+                for row in (*self._in_flight, *self._pending)
+                if row["session"][0] == session_id
+            ]
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait(timeout=self.flush_interval)
+            self.flush()
+
+    def flush(self):
+        """Write everything currently pending, one batch at a time."""
+        # Serialized so the periodic and atexit flushes never interleave batches
+        with self._flush_lock:
+            self._flush_pending()
+
+    def _flush_pending(self):
+        while True:
+            with self._cond:
+                if not self._pending:
+                    return
+                batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+                # Still visible to pending_messages() until the transaction commits
+                self._in_flight = batch
+
+            # One upsert per session: keep the first created_at and the last updated_at
+            sessions = OrderedDict()
+            for row in batch:
+                session_id, created_at, updated_at = row["session"]
+                if session_id in sessions:
+                    sessions[session_id] = (session_id, sessions[session_id][1], updated_at)
+                else:
+                    sessions[session_id] = row["session"]
+            messages = [row["message"] for row in batch]
+
+            start = time.monotonic()
+            try:
+                save_chat_batch(list(sessions.values()), messages)
+            except Exception as e:
+                print(f"Error flushing chat batch: {e}")
+                for row in batch:
+                    row["attempts"] += 1
+                retry = [row for row in batch if row["attempts"] < self.MAX_FLUSH_ATTEMPTS]
+                with self._cond:
+                    self._failures += 1
+                    self._in_flight = []
+                    # Put the batch back in front, dropping the oldest rows if over capacity
+                    room = self.max_pending - len(self._pending)
+                    keep = retry[-room:] if room > 0 else []
+                    kept = {id(row) for row in keep}
+                    self._forget([row for row in batch if id(row) not in kept])
+                    self._dropped += len(batch) - len(keep)
+                    self._pending.extendleft(reversed(keep))
+                return
+
+            finished = time.monotonic()
+            with self._cond:
+                self._in_flight = []
+                self._forget(batch)
+                self._flushed += len(batch)
+                self._batches += 1
+                self._last_flush_ms = (finished - start) * 1000
+                self._last_lag_ms = (finished - batch[0]["queued_at"]) * 1000
+
+    def stats(self):
+        with self._cond:
+            oldest = self._pending[0]["queued_at"] if self._pending else None
+            return {
+                "pending": len(self._pending),
+                "oldest_pending_age_ms": round((time.monotonic() - oldest) * 1000, 2) if oldest else 0.0,
+                "last_flush_lag_ms": round(self._last_lag_ms, 2),
+                "last_flush_duration_ms": round(self._last_flush_ms, 2),
+                "flushed_messages": self._flushed,
+                "batches": self._batches,
+                "failures": self._failures,
+                "dropped": self._dropped,
+            }
+
+
+class SessionStore:
+    """Bounded LRU of session histories, backed by the chat tables."""
+
+    def __init__(self, writer, max_sessions, max_messages):
+        self.writer = writer
+        self.max_sessions = max_sessions
+        self.max_messages = max_messages
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def _put(self, session_id, history):
+        self._sessions[session_id] = history
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.max_sessions:
+            # Sessions with unflushed rows stay cached: the database cannot rebuild them yet
+            victim = next((sid for sid in self._sessions
+                           if sid != session_id and not self.writer.has_pending(sid)), None)
+            if victim is None:
+                break
+            del self._sessions[victim]
+            self._evictions += 1
+
+    def create(self):
+        session_id = str(uuid.uuid4())
+        try:
+            create_chat_session(session_id, datetime.now())
+        except Exception as e:
+            print(f"Error creating chat session: {e}")
+            raise SessionStoreUnavailableError("Chat sessions are temporarily unavailable") from e
+        with self._lock:
+            self._put(session_id, [])
+        return session_id
+
+    def get_history(self, session_id):
+        """
+        Return a copy of the session history.
+
+        On a miss the history is rebuilt from the database plus any rows the
+        writer has not flushed yet.
+        """
+        with self._lock:
+            history = self._sessions.get(session_id)
+            if history is not None:
+                self._hits += 1
+                self._sessions.move_to_end(session_id)
+                return list(history)
+            self._misses += 1
+
+        # Read the queue first: a row flushed in between shows up in both and is deduplicated
+        pending = self.writer.pending_messages(session_id)
+        try:
+            rows = get_chat_session_messages(session_id, limit=self.max_messages)
+        except Exception as e:
+            print(f"Error loading chat session: {e}")
+            raise SessionStoreUnavailableError("Chat history is temporarily unavailable") from e
+        if rows is None and not pending:
+            raise SessionNotFoundError(f"Session {session_id} not found")
+
+        # The writer flushes in queue order, so unflushed rows are newer than stored ones
+        stored = {row["message_id"] for row in rows or []}
+        rows = (rows or []) + [row for row in pending if row["message_id"] not in stored]
+        history = [{"role": row["role"], "content": row["content"]} for row in rows[-self.max_messages:]]
+
+        with self._lock:
+            # Another request may have reloaded it meanwhile
+            cached = self._sessions.get(session_id)
+            if cached is None:
+                self._put(session_id, history)
+                cached = history
+            return list(cached)
+
+    def append_turn(self, session_id, message, reply):
+        """Record a user message and the assistant reply, then queue them for persistence."""
+        with self._lock:
+            # Queued first so a cached session is already pinned against eviction
+            self.writer.enqueue(session_id, message, is_staff=False)
+            self.writer.enqueue(session_id, reply, is_staff=True)
+
+            # Evicted while Gemini was answering: the next miss rebuilds the full
+            # history from the database plus the rows just queued
+            history = self._sessions.get(session_id)
+            if history is None:
+                return
+            history.append({"role": "user", "content": message})
+            history.append({"role": "assistant", "content": reply})
+            del history[:-self.max_messages]
+            self._put(session_id, history)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "write_behind": self.writer.stats(),
+            }
@@ -10,3 +10,46 @@ class Config:
     DB_NAME = os.getenv("DB_NAME") 
     DB_PORT = os.getenv("DB_PORT")
     GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+
+    # Gemini admission control
+    GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", 8))
+    GEMINI_MAX_QUEUE = int(os.getenv("GEMINI_MAX_QUEUE", 32))
+    GEMINI_QUEUE_TIMEOUT = float(os.getenv("GEMINI_QUEUE_TIMEOUT", 5))
+
+    # Gemini deadlines, retries and circuit breaker
+    GEMINI_CALL_TIMEOUT = float(os.getenv("GEMINI_CALL_TIMEOUT", 8))
+    GEMINI_TOTAL_BUDGET = float(os.getenv("GEMINI_TOTAL_BUDGET", 15))
+    GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", 2))
+    GEMINI_BACKOFF_BASE = float(os.getenv("GEMINI_BACKOFF_BASE", 0.25))
+    GEMINI_BREAKER_THRESHOLD = int(os.getenv("GEMINI_BREAKER_THRESHOLD", 5))
+    GEMINI_BREAKER_RESET = float(os.getenv("GEMINI_BREAKER_RESET", 30))
+
+    # Server-side chat sessions
+    CHAT_SESSION_MAX = int(os.getenv("CHAT_SESSION_MAX", 1000))
+    CHAT_SESSION_MAX_MESSAGES = int(os.getenv("CHAT_SESSION_MAX_MESSAGES", 20))
+    CHAT_SESSION_FLUSH_INTERVAL = float(os.getenv("CHAT_SESSION_FLUSH_INTERVAL", 2))
+    CHAT_SESSION_FLUSH_BATCH = int(os.getenv("CHAT_SESSION_FLUSH_BATCH", 100))
+    CHAT_SESSION_MAX_PENDING = int(os.getenv("CHAT_SESSION_MAX_PENDING", 10000))
+
+    # Chatbot context retrieval with the recommender's TF-IDF model
+    CHATBOT_SEMANTIC_RETRIEVAL = os.getenv("CHATBOT_SEMANTIC_RETRIEVAL", "true").lower() == "true"
+    CHATBOT_RETRIEVAL_K = int(os.getenv("CHATBOT_RETRIEVAL_K", 5))
+    CHATBOT_RETRIEVAL_MIN_SCORE = float(os.getenv("CHATBOT_RETRIEVAL_MIN_SCORE", 0.05))
+
+    # Diversified recommendations (?diversify=true): MMR candidate pool, relevance weight, penalties
+    RECOMMEND_MMR_POOL = int(os.getenv("RECOMMEND_MMR_POOL", 50))
+    RECOMMEND_MMR_LAMBDA = float(os.getenv("RECOMMEND_MMR_LAMBDA", 0.7))
+    RECOMMEND_MMR_DESTINATION_PENALTY = float(os.getenv("RECOMMEND_MMR_DESTINATION_PENALTY", 0.3))
+    RECOMMEND_MMR_CATEGORY_PENALTY = float(os.getenv("RECOMMEND_MMR_CATEGORY_PENALTY", 0.1))
+
+    # HTTP caching of recommendation responses
+    RECOMMEND_CACHE_MAX_AGE = int(os.getenv("RECOMMEND_CACHE_MAX_AGE", 600))
+    RECOMMEND_USER_CACHE_MAX_AGE = int(os.getenv("RECOMMEND_USER_CACHE_MAX_AGE", 60))
+    COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", 1024))
+
+    # On-demand request profiling (off by default)
+    PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+    PROFILING_TOKEN = os.getenv("PROFILING_TOKEN")
+    PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", 0))
+    PROFILING_INTERVAL_MS = float(os.getenv("PROFILING_INTERVAL_MS", 5))
+    PROFILING_RING_SIZE = int(os.getenv("PROFILING_RING_SIZE", 50))
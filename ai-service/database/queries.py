@@ -46,6 +46,37 @@ def get_tours_summary(limit=10):
         return None
 
 
+def get_tours_by_ids(tour_ids):
+    """Get active tours by id, keeping the order of tour_ids (e.g. retrieval rank)."""
+    if not tour_ids:
+        return None
+    try:
+        conn = get_db_connection()
+        with conn.cursor() as cursor:
+            placeholders = ", ".join(["%s"] * len(tour_ids))
+            query = f"""
+                SELECT t.tour_id, t.title, t.description, t.itinerary,
+                       t.destination, t.duration, t.region, t.category,
+                       t.price_adult, t.price_child, t.capacity, t.availability,
+                       t.start_date, t.end_date,
+                       COALESCE(AVG(r.rating), 0) as average_rating,
+                       COUNT(r.review_id) as review_count
+                FROM tours t
+                LEFT JOIN reviews r ON t.tour_id = r.tour_id
+                WHERE t.is_active = 1 AND t.tour_id IN ({placeholders})
+                GROUP BY t.tour_id
+            """
+            cursor.execute(query, tuple(tour_ids))
+            tours = cursor.fetchall()
+        conn.close()
+        rank = {tour_id: i for i, tour_id in enumerate(tour_ids)}
+        tours = sorted(tours, key=lambda t: rank[t['tour_id']])
+        return format_tours_for_display(tours)
+    except Exception as e:
+        print(f"Error getting tours by ids: {e}")
+        return None
+
+
 def search_tours(destination=None, region=None, category=None, 
                  min_price=None, max_price=None, min_rating=None,
                  start_date_from=None, end_date_to=None,
@@ -160,6 +191,98 @@ def get_tour_details(tour_id):
         return None
 
 
+def get_chat_session_messages(session_id, limit=20):
+    """
+    Load the latest messages of a chat session, oldest first.
+    Returns None if the session does not exist; database errors are raised
+    so the caller can tell them apart from a missing session.
+    """
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT session_id FROM chat_sessions WHERE session_id = %s", (session_id,))
+            if not cursor.fetchone():
+                return None
+            
+            query = """
+                SELECT message_id, content, is_staff = 1 AS is_staff, created_at
+                FROM chat_messages
+                WHERE session_id = %s
+                ORDER BY created_at DESC
+                LIMIT %s
+            """
+            # is_staff is a BIT column that PyMySQL returns as bytes (b'\x00' is truthy),
+            # so compare in SQL to get an integer back
+            cursor.execute(query, (session_id, limit))
+            rows = cursor.fetchall()
+    finally:
+        conn.close()
+    
+    return [
+        {
+            "message_id": row['message_id'],
+            "role": "assistant" if row['is_staff'] else "user",
+            "content": row['content'],
+        }
+        for row in reversed(rows)
+    ]
+
+
+def create_chat_session(session_id, created_at):
+    """Insert an open chat session row; raises on failure."""
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO chat_sessions (session_id, status, created_at, updated_at)
+                VALUES (%s, 'OPEN', %s, %s)
+                """,
+                (session_id, created_at, created_at)
+            )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def save_chat_batch(sessions, messages):
+    """
+    Persist a batch of chat sessions and messages in one transaction.
+    
+    Args:
+        sessions: list of (session_id, created_at, updated_at)
+        messages: list of (message_id, session_id, content, is_staff, created_at)
+    
+    Raises on failure so the caller can retry the batch.
+    """
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            if sessions:
+                cursor.executemany(
+                    """
+                    INSERT INTO chat_sessions (session_id, status, created_at, updated_at)
+                    VALUES (%s, 'OPEN', %s, %s)
+                    ON DUPLICATE KEY UPDATE updated_at = VALUES(updated_at)
+                    """,
+                    sessions
+                )
+            if messages:
+                cursor.executemany(
+                    """
+                    INSERT INTO chat_messages (message_id, session_id, content, is_staff, is_read, created_at)
+                    VALUES (%s, %s, %s, %s, 1, %s)
+                    """,
+                    messages
+                )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
 def format_tours_for_display(tours):
     """Format tours data for AI context with full details."""
     if not tours:
@@ -0,0 +1,72 @@
+"""
+HTTP caching helpers: strong ETags, conditional GETs and gzip compression.
+"""
+import gzip
+import hashlib
+from flask import request, jsonify, make_response
+from config import Config
+
+
+def fingerprint(*parts):
+    """Stable hex digest of the given values, used for model versions and ETags."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\x1f")
+    return digest.hexdigest()[:32]
+
+
+def _cache_control(max_age, private):
+    return f"{'private' if private else 'public'}, max-age={max_age}"
+
+
+def not_modified(etag, max_age, private=False):
+    """Return a 304 response if the client already holds this ETag, else None."""
+    inm = request.if_none_match
+    # If-None-Match uses weak comparison (RFC 7232 3.2), so W/ tags match too.
+    # A gzipped representation carries the same ETag with a -gzip suffix
+    if inm.contains_weak(etag):
+        matched = etag
+    elif inm.contains_weak(f"{etag}-gzip"):
+        matched = f"{etag}-gzip"
+    else:
+        return None
+    response = make_response("", 304)
+    response.set_etag(matched)
+    response.headers["Cache-Control"] = _cache_control(max_age, private)
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def cached_json(payload, etag, max_age, private=False):
+    """jsonify() with a strong ETag and Cache-Control max-age."""
+    response = jsonify(payload)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = _cache_control(max_age, private)
+    return response
+
+
+def compress_response(response):
+    """after_request hook: gzip JSON bodies above COMPRESS_MIN_SIZE."""
+    if (response.status_code != 200
+            or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+            or response.mimetype != "application/json"):
+        return response
+
+    # Caches must key on the encoding whenever a gzipped variant is possible
+    response.vary.add("Accept-Encoding")
+    if "gzip" not in request.accept_encodings:
+        return response
+
+    data = response.get_data()
+    if len(data) < Config.COMPRESS_MIN_SIZE:
+        return response
+
+    response.set_data(gzip.compress(data, compresslevel=6))
+    response.headers["Content-Encoding"] = "gzip"
+
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f"{etag}-gzip", weak)
+    return response
@@ -0,0 +1,172 @@
+"""
+On-demand request profiling.
+
+When PROFILING_ENABLED is set, a request is profiled if it carries
+"X-Profile: <PROFILING_TOKEN>" or is picked by PROFILING_SAMPLE_RATE.
+A background thread samples the request thread's stack every
+PROFILING_INTERVAL_MS and the result is kept in a bounded in-memory ring
+in folded-stack format (one "frame;frame;frame count" line per stack),
+which flamegraph.pl and speedscope read directly.
+
+When PROFILING_ENABLED is off, no hooks or routes are registered.
+"""
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from flask import Blueprint, g, jsonify, request, Response
+from config import Config
+
+
+class StackSampler:
+    """Periodically sample the stack of one thread from a background thread."""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self._thread.start()
+
+    def stop(self):
+        if not self._stop.is_set():
+            self._stop.set()
+            self._thread.join()
+            self.duration = time.perf_counter() - self._start
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_qualname}")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+
+class ProfileRing:
+    """Thread-safe bounded buffer of finished profiles, newest last."""
+
+    def __init__(self, size):
+        self._profiles = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, profile):
+        with self._lock:
+            self._profiles.append(profile)
+
+    def get(self, profile_id):
+        with self._lock:
+            for profile in self._profiles:
+                if profile["id"] == profile_id:
+                    return profile
+        return None
+
+    def summaries(self):
+        with self._lock:
+            return [
+                {key: value for key, value in profile.items() if key != "samples"}
+                for profile in reversed(self._profiles)
+            ]
+
+
+profiles = ProfileRing(Config.PROFILING_RING_SIZE)
+profiling_bp = Blueprint('profiling', __name__, url_prefix='/admin/profiles')
+
+
+def _authorized(header):
+    token = request.headers.get(header)
+    return bool(Config.PROFILING_TOKEN and token
+                and hmac.compare_digest(token, Config.PROFILING_TOKEN))
+
+
+def start_profiling():
+    """before_request hook: start a sampler for requests that opted in or were sampled."""
+    if request.blueprint == profiling_bp.name:
+        return
+    if not (_authorized("X-Profile") or random.random() < Config.PROFILING_SAMPLE_RATE):
+        return
+    sampler = StackSampler(threading.get_ident(), Config.PROFILING_INTERVAL_MS / 1000)
+    sampler.start()
+    g.profiler = sampler
+
+
+def finish_profiling(response):
+    """after_request hook: store the profile and tell the caller its id."""
+    sampler = g.pop("profiler", None)
+    if sampler is None:
+        return response
+    sampler.stop()
+
+    profile_id = uuid.uuid4().hex
+    profiles.add({
+        "id": profile_id,
+        "method": request.method,
+        "path": request.full_path.rstrip("?"),
+        "status": response.status_code,
+        "started_at": sampler.started_at,
+        "duration_ms": round(sampler.duration * 1000, 2),
+        "interval_ms": Config.PROFILING_INTERVAL_MS,
+        "sample_count": sum(sampler.samples.values()),
+        "samples": dict(sampler.samples),
+    })
+    response.headers["X-Profile-Id"] = profile_id
+    return response
+
+
+def stop_profiling(error=None):
+    """teardown hook: make sure the sampler thread ends if the request failed."""
+    sampler = g.pop("profiler", None)
+    if sampler is not None:
+        sampler.stop()
+
+
+@profiling_bp.before_request
+def require_admin_token():
+    if not _authorized("X-Admin-Token"):
+        return jsonify({"error": "Unauthorized"}), 401
+
+
+@profiling_bp.route('', methods=['GET'])
+def list_profiles():
+    """Most recent profiles first, without their samples."""
+    return jsonify({"profiles": profiles.summaries()})
+
+
+@profiling_bp.route('/<profile_id>', methods=['GET'])
+def get_profile(profile_id):
+    """
+    A single profile in folded-stack format (text/plain),
+    or as JSON with ?format=json.
+    """
+    profile = profiles.get(profile_id)
+    if profile is None:
+        return jsonify({"error": "Profile not found"}), 404
+
+    if request.args.get('format') == 'json':
+        return jsonify(profile)
+
+    folded = "\n".join(f"{stack} {count}" for stack, count in
+                       sorted(profile["samples"].items(), key=lambda item: -item[1]))
+    return Response(folded + "\n", mimetype="text/plain")
+
+
+def init_profiling(app):
+    """Register profiling hooks and admin routes, only if profiling is enabled."""
+    if not Config.PROFILING_ENABLED:
+        return
+    app.before_request(start_profiling)
+    app.after_request(finish_profiling)
+    app.teardown_request(stop_profiling)
+    app.register_blueprint(profiling_bp)
@@ -0,0 +1 @@
+# Recommendation model module for AI service
@@ -0,0 +1,92 @@
+"""
+Trained recommendation model shared by the recommend handlers and the chatbot.
+"""
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import linear_kernel
+from http_cache import fingerprint
+from recommender.store import TourStore
+
+
+class TrainedModel:
+    """Everything produced by one run of train_model()."""
+
+    def __init__(self, vectorizer, tfidf_matrix, cosine_sim, tour_store, version):
+        self.vectorizer = vectorizer
+        self.tfidf_matrix = tfidf_matrix
+        self.cosine_sim = cosine_sim
+        self.tour_store = tour_store
+        self.version = version
+
+
+# Swapped as a whole so readers never see a half-trained model
+_current_model = None
+
+
+def set_current_model(model):
+    global _current_model
+    _current_model = model
+
+
+def get_current_model():
+    """The latest trained model, or None if training has not succeeded yet."""
+    return _current_model
+
+
+def make_vectorizer():
+    return TfidfVectorizer(stop_words='english')
+
+
+def build_soup(rows, store):
+    """Title + destination + description text per tour, in matrix row order."""
+    descriptions = {}
+    for row in rows:
+        # First occurrence wins, matching the row TourStore kept
+        descriptions.setdefault(row['tour_id'], row.get('description') or '')
+    return [
+        f"{row['title']} {row['destination']} {descriptions[tour_id]}"
+        for tour_id, row in store.rows.items()
+    ]
+
+
+def vectorize_tours(rows, store):
+    """
+    Fit TF-IDF on the tour soup and fingerprint the result.
+    Returns (vectorizer, matrix, version); drops 'description' from rows.
+    """
+    # The text soup only lives until it is vectorized
+    soup = build_soup(rows, store)
+    # The caller's rows are the other copy of the descriptions; drop it as well
+    for row in rows:
+        row.pop('description', None)
+    
+    tfidf = make_vectorizer()
+    matrix = tfidf.fit_transform(soup)
+    
+    # Same tours and text give the same version, so client caches survive restarts.
+    # Stored rows include destination and category, which MMR diversification reads.
+    version = fingerprint(tfidf.get_params(), *store.rows.values(), *soup)
+    return tfidf, matrix, version
+
+
+def compute_similarities(matrix):
+    """Dense tour x tour cosine similarity (TF-IDF rows are L2-normalised)."""
+    return linear_kernel(matrix, matrix)
+
+
+def build_model(rows):
+    """
+    Vectorize tour rows fetched from the database and compute similarities.
+    Takes ownership of rows: their descriptions are dropped once the soup is built.
+    """
+    print("  -> Preprocessing data...")
+    store = TourStore(rows)
+    
+    print("  -> Vectorizing text (TF-IDF)...")
+    tfidf, matrix, version = vectorize_tours(rows, store)
+    print(f"  -> Vectorization complete. Matrix shape: {matrix.shape}")
+    
+    print("  -> Calculating Cosine Similarity...")
+    similarities = compute_similarities(matrix)
+    print("  -> Cosine Similarity complete.")
+    
+    return TrainedModel(tfidf, matrix, similarities, store, version)
@@ -0,0 +1,24 @@
+"""
+Semantic retrieval of tours for free-text queries, using the fitted TF-IDF model.
+"""
+from recommender.scoring import top_k
+
+
+def retrieve_tours(model, text, k=5, min_score=0.0):
+    """
+    Return up to k (tour_id, score) pairs most similar to text, best first.
+
+    The query is embedded with the fitted vectorizer and scored against every
+    tour with one sparse dot product; only tours scoring above min_score count.
+    """
+    query = model.vectorizer.transform([text])
+    if query.nnz == 0:
+        return []
+
+    # Rows are L2-normalised, so the dot product is the cosine similarity
+    scores = (model.tfidf_matrix @ query.T).toarray().ravel()
+
+    top = top_k(scores, k)
+    top = top[scores[top] > min_score]
+
+    return list(zip(model.tour_store.ids_at(top), scores[top].tolist()))
@@ -0,0 +1,88 @@
+"""
+Top-k scoring over the precomputed cosine similarity matrix,
+with optional maximal marginal relevance (MMR) diversification.
+"""
+import numpy as np
+
+
+def similar_scores(model, idx):
+    """Similarity of every tour to row idx, with idx itself masked out."""
+    scores = model.cosine_sim[idx].copy()
+    scores[idx] = -np.inf
+    return scores
+
+
+def profile_scores(model, known_indices):
+    """Summed similarity to the known tours, with the known tours masked out."""
+    scores = model.cosine_sim[known_indices].sum(axis=0)
+    scores[known_indices] = -np.inf
+    return scores
+
+
+def top_k(scores, k):
+    """Rows of the k best finite scores, best first (ties by row), via partial selection."""
+    k = min(k, scores.size)
+    if k <= 0:
+        return np.array([], dtype=np.intp)
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.lexsort((top, -scores[top]))]
+    return top[np.isfinite(scores[top])]
+
+
+def mmr_rerank(model, scores, k, pool_size, lambda_, destination_penalty, category_penalty):
+    """
+    Pick k rows by maximal marginal relevance from the pool_size best candidates.
+
+    Each step selects argmax(lambda * relevance - (1 - lambda) * redundancy),
+    where redundancy is the highest similarity to an already selected tour plus
+    penalties for sharing its destination or category. All work is on
+    pool_size x pool_size arrays, independent of the catalog size.
+    """
+    pool = top_k(scores, max(pool_size, k))
+    if pool.size <= 1:
+        return pool
+
+    relevance = scores[pool]
+    if relevance[0] > 0:
+        relevance = relevance / relevance[0]
+
+    store = model.tour_store
+    destinations = store.destination_codes[pool]
+    categories = store.category_codes[pool]
+    redundancy = (
+        model.cosine_sim[np.ix_(pool, pool)]
+        + destination_penalty * (destinations[:, None] == destinations[None, :])
+        + category_penalty * (categories[:, None] == categories[None, :])
+    )
+
+    # Most relevant candidate first, then trade relevance against redundancy
+    selected = [0]
+    max_redundancy = redundancy[0].copy()
+    available = np.ones(pool.size, dtype=bool)
+    available[0] = False
+
+    for _ in range(min(k, pool.size) - 1):
+        mmr = lambda_ * relevance - (1 - lambda_) * max_redundancy
+        mmr[~available] = -np.inf
+        pick = int(np.argmax(mmr))
+        selected.append(pick)
+        available[pick] = False
+        np.maximum(max_redundancy, redundancy[pick], out=max_redundancy)
+
+    return pool[selected]
+
+
+def top_similar(model, idx, k=5, diversity=None):
+    """Rows of the k tours most similar to row idx, best first, excluding idx."""
+    scores = similar_scores(model, idx)
+    if diversity:
+        return mmr_rerank(model, scores, k, **diversity)
+    return top_k(scores, k)
+
+
+def top_for_profile(model, known_indices, k=5, diversity=None):
+    """Rows of the k tours closest to the summed profile, best first, excluding known_indices."""
+    scores = profile_scores(model, known_indices)
+    if diversity:
+        return mmr_rerank(model, scores, k, **diversity)
+    return top_k(scores, k)
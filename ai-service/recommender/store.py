@@ -0,0 +1,54 @@
+"""
+Compact in-memory tour store for the recommend handlers.
+Replaces the pandas DataFrame/Series lookups on the request path.
+"""
+import numpy as np
+
+
+# Columns kept per tour once the text has been vectorized
+ROW_FIELDS = ('tour_id', 'title', 'destination', 'category')
+
+
+class TourStore:
+    """
+    Active tours keyed by id, aligned with the rows of the TF-IDF matrix.
+
+    - rows: tour_id -> {tour_id, title, destination, category}
+    - ids: object array of tour ids, position i == matrix row i
+    - destination_codes / category_codes: int32 codes for vectorized comparisons
+    """
+
+    def __init__(self, tours):
+        self.rows = {}
+        for tour in tours:
+            # First occurrence wins, like the old drop_duplicates() index
+            if tour['tour_id'] not in self.rows:
+                self.rows[tour['tour_id']] = {field: tour.get(field) or '' for field in ROW_FIELDS}
+
+        self.ids = np.array(list(self.rows), dtype=object)
+        self.index = {tour_id: i for i, tour_id in enumerate(self.rows)}
+
+        destinations = [row['destination'].strip().lower() for row in self.rows.values()]
+        categories = [row['category'] for row in self.rows.values()]
+        self.destination_labels, destination_codes = np.unique(
+            np.array(destinations, dtype=object), return_inverse=True
+        )
+        self.category_labels, category_codes = np.unique(
+            np.array(categories, dtype=object), return_inverse=True
+        )
+        self.destination_codes = destination_codes.astype(np.int32)
+        self.category_codes = category_codes.astype(np.int32)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, tour_id):
+        return tour_id in self.index
+
+    def index_of(self, tour_id):
+        """Matrix row of a tour, or None if it is not loaded."""
+        return self.index.get(tour_id)
+
+    def ids_at(self, positions):
+        """Tour ids for a sequence of matrix rows, as a plain list."""
+        return self.ids[np.asarray(positions, dtype=np.intp)].tolist()